@@ -1,19 +1,29 @@
 import os
 import re
+import time
+import atexit
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import qrcode
 import secrets
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 import json
+import numpy as np
 from io import BytesIO
 from datetime import datetime, timedelta, time as dtime
-from functools import wraps
+from zoneinfo import ZoneInfo
+from functools import wraps, lru_cache
+from itertools import combinations, groupby
 import random
 # --- Third-party Libraries ---
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    session, flash, jsonify, send_file
+    session, flash, jsonify, send_file, send_from_directory, g
 )
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
+from sqlalchemy.orm import joinedload, selectinload, load_only
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from reportlab.lib.pagesizes import A4
@@ -23,6 +33,7 @@ from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
+from reportlab import rl_config
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart # This import is correct
@@ -30,23 +41,74 @@ from email.mime.application import MIMEApplication
 from authlib.integrations.flask_client import OAuth
 from dotenv import load_dotenv
 import stripe
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Numba is optional: when present the seat-pricing kernel is JIT-compiled,
+# otherwise it runs as plain Python over NumPy scalars.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(f): return f
+        return wrap
 
 
 # --- Load Environment Variables ---
 load_dotenv()
 
+# --- ReportLab tuning: skip per-drawString shape checks, deterministic output ---
+rl_config.shapeChecking = 0
+rl_config.invariant = 1
+
+# Register the optional ticket font once at import — registering fonts per
+# render is an order-of-magnitude cost. Falls back to built-in Helvetica
+# when no TTF is shipped under static/fonts.
+_FONT_DIR = os.path.join(os.path.dirname(__file__), "static", "fonts")
+try:
+    pdfmetrics.registerFont(TTFont("Inter", os.path.join(_FONT_DIR, "Inter-Regular.ttf")))
+    pdfmetrics.registerFont(TTFont("Inter-Bold", os.path.join(_FONT_DIR, "Inter-Bold.ttf")))
+    TICKET_FONT, TICKET_FONT_BOLD = "Inter", "Inter-Bold"
+except Exception:
+    TICKET_FONT, TICKET_FONT_BOLD = "Helvetica", "Helvetica-Bold"
+
+# Ticket palette — HexColor parses its argument, so build these once.
+TICKET_BG = colors.HexColor("#1e2a38")
+TICKET_STUB_BG = colors.HexColor("#15202b")
+TICKET_PRIMARY = colors.HexColor("#ffffff")
+TICKET_SECONDARY = colors.HexColor("#a0b0c0")
+TICKET_ACCENT = colors.HexColor("#ffc107")
+
 # ==============================================================================
 # APP & CONFIGURATION SETUP
 # ==============================================================================
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson (Rust) — much faster than the stdlib
+    encoder for large payloads like serialized seat grids."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=self.default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Load configuration from environment variables with safe defaults
 app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
+# Don't re-sign and re-set the session cookie on every response; only when
+# the session actually changes.
+app.config["SESSION_REFRESH_EACH_REQUEST"] = False
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///cinema.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Explicit so a stray env override can't turn on per-statement SQL logging.
+app.config["SQLALCHEMY_ECHO"] = False
 app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", "static/uploads")
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024
-app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
+app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
 # Email configuration
 app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER", "smtp.gmail.com")
@@ -63,11 +125,24 @@ app.config["GOOGLE_CLIENT_SECRET"] = os.getenv("GOOGLE_CLIENT_SECRET")
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 app.config["STRIPE_PUBLISHABLE_KEY"] = os.getenv("STRIPE_PUBLISHABLE_KEY")
 
+# Server-side sessions (opt-in). The booking funnel keeps the growing
+# pending_booking blob in the session; with the default cookie session that
+# whole blob is signed, base64'd and echoed by the browser on every request.
+# Set SESSION_REDIS_URL to store sessions in Redis so the cookie carries
+# only an opaque id.
+if os.getenv("SESSION_REDIS_URL"):
+    import redis
+    from flask_session import Session
+    app.config["SESSION_TYPE"] = "redis"
+    app.config["SESSION_REDIS"] = redis.from_url(os.getenv("SESSION_REDIS_URL"))
+    Session(app)
+
 # ==============================================================================
 # EXTENSIONS INITIALIZATION
 # ==============================================================================
 db = SQLAlchemy(app)
 oauth = OAuth(app)
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
 
 google = oauth.register(
     name="google",
@@ -86,6 +161,7 @@ class Theater(db.Model):
     address = db.Column(db.String(200), nullable=False)
     city = db.Column(db.String(50), nullable=False)
     image_url = db.Column(db.String(200))
+    showtimes = db.relationship("Showtime", back_populates="theater", lazy=True, cascade="all, delete-orphan")
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -100,7 +176,16 @@ class User(db.Model):
     provider = db.Column(db.String(20), default="local")
     reset_token = db.Column(db.String(100), unique=True)
     reset_token_expiry = db.Column(db.DateTime)
-    def set_password(self, p): self.password_hash = generate_password_hash(p)
+    bookings = db.relationship("Booking", back_populates="user", lazy=True)
+    reviews = db.relationship("Review", back_populates="user", lazy=True)
+    # The reset endpoint always filters on token AND expiry; a composite
+    # index serves that lookup without touching the table. Most rows have
+    # both columns NULL, so the index stays small.
+    __table_args__ = (db.Index("ix_user_reset", "reset_token", "reset_token_expiry"),)
+    # scrypt runs in OpenSSL C and is far cheaper per login than werkzeug's
+    # default 600k-iteration pbkdf2; check_password_hash still verifies
+    # either scheme, so existing pbkdf2 hashes keep working.
+    def set_password(self, p): self.password_hash = generate_password_hash(p, method="scrypt")
     def check_password(self, p): return check_password_hash(self.password_hash, p) if self.password_hash else False
 
 class Movie(db.Model):
@@ -116,6 +201,10 @@ class Movie(db.Model):
     director = db.Column(db.String(100))
     cast = db.Column(db.Text)
     trailer_url = db.Column(db.String(200))
+    showtimes = db.relationship("Showtime", back_populates="movie", lazy=True, cascade="all, delete-orphan")
+    reviews = db.relationship("Review", back_populates="movie", lazy=True, cascade="all, delete-orphan")
+    # Lets the distinct-genre query run as an index-only scan.
+    __table_args__ = (db.Index("ix_movie_active_genre", "is_active", "genre"),)
 
 class Showtime(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -128,27 +217,42 @@ class Showtime(db.Model):
     price_standard = db.Column(db.Float, default=250.0)
     price_premium = db.Column(db.Float, default=400.0)
     price_vip = db.Column(db.Float, default=600.0)
-    movie = db.relationship("Movie", backref=db.backref("showtimes", lazy=True, cascade="all, delete-orphan"))
-    theater = db.relationship("Theater", backref=db.backref("showtimes", lazy=True, cascade="all, delete-orphan"))
+    # Joined eager loads: ticket/email/list paths always touch .movie and
+    # .theater, so fetch them in the same SELECT instead of one lazy query each.
+    movie = db.relationship("Movie", back_populates="showtimes", lazy="joined")
+    theater = db.relationship("Theater", back_populates="showtimes", lazy="joined")
+    seat_layout = db.relationship("SeatLayout", back_populates="showtime", uselist=False, cascade="all, delete-orphan")
+    bookings = db.relationship("Booking", back_populates="showtime", lazy=True)
+    __table_args__ = (db.Index("ix_showtime_movie_time", "movie_id", "time"),
+                      db.Index("ix_showtime_theater_time", "theater_id", "time"),
+                      db.Index("ix_showtime_theater_movie", "theater_id", "movie_id"))
 
 class SeatLayout(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     showtime_id = db.Column(db.Integer, db.ForeignKey("showtime.id", ondelete="CASCADE"), unique=True, nullable=False)
-    layout = db.Column(db.Text, nullable=False)
-    showtime = db.relationship("Showtime", backref=db.backref("seat_layout", uselist=False, cascade="all, delete-orphan"))
+    # Raw uint8 grid bytes (1 byte/seat); shape comes from the showtime's
+    # rows/cols. Roughly 5x smaller than the JSON text it replaces.
+    layout = db.Column(db.LargeBinary, nullable=False)
+    # Optimistic-concurrency guard: seat updates only apply when the version
+    # they read is still current, so two buyers can't both take a seat.
+    version = db.Column(db.Integer, default=0, nullable=False)
+    showtime = db.relationship("Showtime", back_populates="seat_layout")
 
 class Booking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     showtime_id = db.Column(db.Integer, db.ForeignKey('showtime.id'), nullable=False)
-    food_items = db.Column(db.Text, nullable=True)
-    seats = db.Column(db.Text, nullable=False)
+    # Native JSON columns: SQLAlchemy parses once at row hydration instead of
+    # every json.loads at each access. Legacy Text rows deserialize the same.
+    food_items = db.Column(db.JSON, nullable=True)
+    seats = db.Column(db.JSON, nullable=False)
     total_price = db.Column(db.Float, nullable=False)
     booking_time = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default="confirmed")
     attended = db.Column(db.Boolean, default=False)
-    user = db.relationship('User', backref='bookings', lazy=True)
-    showtime = db.relationship('Showtime', backref='bookings', lazy=True)
+    user = db.relationship("User", back_populates="bookings")
+    showtime = db.relationship("Showtime", back_populates="bookings", lazy="joined")
+    __table_args__ = (db.Index("ix_booking_user_time", "user_id", "booking_time"),)
 
 class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -157,8 +261,8 @@ class Review(db.Model):
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user = db.relationship("User", backref=db.backref("reviews", lazy=True))
-    movie = db.relationship("Movie", backref=db.backref("reviews", lazy=True, cascade="all, delete-orphan"))
+    user = db.relationship("User", back_populates="reviews")
+    movie = db.relationship("Movie", back_populates="reviews")
 
 class FoodItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -181,133 +285,440 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = session.get("user")
-        if not user or user.get("role") != "admin":
+@app.before_request
+def load_user():
+    g.user = session.get("user")
+
+@app.context_processor
+def inject_user():
+    # Every template gets `user` from here; routes no longer pass it. A
+    # view can still override it explicitly (the profile page passes the
+    # full ORM user).
+    return {"user": g.get("user")}
+
+@app.before_request
+def guard_admin_views():
+    # Every admin view shares the admin_ endpoint prefix, so the role check
+    # runs once here instead of through a per-view decorator.
+    if (request.endpoint or "").startswith("admin_"):
+        if not g.user or g.user.get("role") != "admin":
             flash("Admin access is required for this page.", "danger")
             return redirect(url_for("index"))
-        return f(*args, **kwargs)
-    return decorated_function
-    
+
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+def save_uploaded_image(file, subfolder="", max_side=1024, basename=None):
+    """Save an upload downscaled to max_side px and re-encoded as WebP.
+
+    Image.draft lets libjpeg decode large JPEGs at a reduced scale, so the
+    full-resolution source is never fully decoded; WebP at q85 is smaller
+    on disk than the JPEG/PNG originals. The filename embeds a content
+    hash, so the /media route can serve it as immutable and edits bust the
+    cache automatically. Returns the media URL, or None (with a flashed
+    error) when the content isn't a decodable image — the extension check
+    upstream says nothing about the bytes.
+    """
+    digest = hashlib.sha1(file.stream.read()).hexdigest()[:16]
+    file.stream.seek(0)
+    base = basename or os.path.splitext(secure_filename(file.filename))[0] or "upload"
+    filename = f"{digest}_{base}.webp"
+    folder = os.path.join(app.config['UPLOAD_FOLDER'], subfolder) if subfolder else app.config['UPLOAD_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    try:
+        img = Image.open(file.stream)
+        img.draft("RGB", (max_side, max_side))
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        img.save(os.path.join(folder, filename), "webp", quality=85)
+    except (UnidentifiedImageError, OSError) as e:
+        app.logger.warning(f"Rejected upload {file.filename!r}: {e}")
+        flash("The uploaded file is not a valid image.", "danger")
+        return None
+    rel = f"{subfolder}/{filename}" if subfolder else filename
+    return url_for('media_file', name=rel)
+
 def create_seat_layout(rows, cols, seat_categories=None):
-    # Create a 2D list (grid) with plain Python
-    layout = [[0 for _ in range(int(cols))] for _ in range(int(rows))]
+    # Build the grid as a uint8 array (1 byte/seat vs a boxed int each) and
+    # assign whole categories with fancy indexing instead of Python loops.
+    rows, cols = int(rows), int(cols)
+    layout = np.zeros((rows, cols), dtype=np.uint8)
     if seat_categories:
+        codes = {"premium": 2, "vip": 4}
         for cat, positions in seat_categories.items():
-            for r, c in positions:
-                if 0 <= r < int(rows) and 0 <= c < int(cols):
-                    if cat.lower() == "premium": layout[r][c] = 2
-                    elif cat.lower() == "vip": layout[r][c] = 4
+            code = codes.get(cat.lower())
+            if code is None or not positions:
+                continue
+            rs, cs = np.asarray(positions, dtype=np.intp).T
+            valid = (rs >= 0) & (rs < rows) & (cs >= 0) & (cs < cols)
+            layout[rs[valid], cs[valid]] = code
+    return layout
+
+def encode_layout(layout):
+    return np.asarray(layout, dtype=np.uint8).tobytes()
+
+def decode_layout(blob, rows, cols):
+    # Rows written before the binary format are JSON text; convert them
+    # transparently on read. frombuffer views are read-only, hence .copy().
+    if isinstance(blob, str) or blob[:1] == b"[":
+        return np.asarray(json.loads(blob), dtype=np.uint8)
+    return np.frombuffer(blob, dtype=np.uint8).reshape(int(rows), int(cols)).copy()
+
+# Process-local cache of decoded seat layouts keyed by showtime_id, so the
+# hot seat-map and checkout paths skip the decode on every request.
+# Every write to a layout must call invalidate_layout() after committing.
+_layout_cache = {}
+
+def get_layout(showtime_id):
+    layout = _layout_cache.get(showtime_id)
+    if layout is None:
+        row = SeatLayout.query.filter_by(showtime_id=showtime_id).first()
+        if row is None:
+            return None
+        layout = decode_layout(row.layout, row.showtime.rows, row.showtime.cols)
+        _layout_cache[showtime_id] = layout
     return layout
 
+def invalidate_layout(showtime_id):
+    _layout_cache.pop(showtime_id, None)
+
+def _release_seats(showtime_id, seats):
+    # Flip booked seats back to free with the same version-guarded UPDATE
+    # the booking path uses, so cancellations can't clobber a concurrent
+    # booking's write. Callers invalidate the layout cache after commit.
+    # Returns False when the retries are exhausted so callers can warn.
+    showtime = db.session.get(Showtime, showtime_id)
+    if showtime is None:
+        return True
+    for _ in range(3):
+        layout_obj = SeatLayout.query.filter_by(showtime_id=showtime_id).first()
+        if layout_obj is None:
+            return True
+        layout = decode_layout(layout_obj.layout, showtime.rows, showtime.cols)
+        for seat in seats:
+            r, c = int(seat["row"]), int(seat["col"])
+            if layout[r][c] % 2 != 0: layout[r][c] -= 1
+        updated = db.session.execute(
+            db.update(SeatLayout)
+            .where(SeatLayout.showtime_id == showtime_id,
+                   SeatLayout.version == layout_obj.version)
+            .values(layout=encode_layout(layout), version=SeatLayout.version + 1))
+        if updated.rowcount == 1:
+            return True
+        db.session.expire(layout_obj)
+    app.logger.error(f"Failed to release seats for showtime {showtime_id} after 3 attempts")
+    return False
+
+@njit(cache=True)
+def _sum_seat_prices(codes, price_standard, price_premium, price_vip):
+    # Branch on the seat code (0/1 standard, 2/3 premium, 4/5 VIP) without
+    # per-seat Python dispatch; compiled to native code when Numba is around.
+    total = 0.0
+    for i in range(codes.shape[0]):
+        c = codes[i]
+        if c >= 4: total += price_vip
+        elif c >= 2: total += price_premium
+        else: total += price_standard
+    return total
+
+def sum_seat_prices(showtime, codes):
+    return float(_sum_seat_prices(np.asarray(codes, dtype=np.uint8),
+                                  float(showtime.price_standard),
+                                  float(showtime.price_premium),
+                                  float(showtime.price_vip)))
+
+@cache.memoize(timeout=600)
+def _all_theaters():
+    # The theater set changes on the order of days; serve the homepage from
+    # cache and only project the columns index.html actually renders.
+    return (Theater.query
+            .options(load_only(Theater.id, Theater.name, Theater.address, Theater.image_url))
+            .order_by(Theater.name).all())
+
+@cache.memoize(timeout=600)
+def _active_genres():
+    # DISTINCT over the genre column only — no point hydrating every Movie
+    # row to build a handful of strings. The genre set changes rarely, so
+    # it is memoized and dropped whenever an admin mutates movies.
+    rows = (db.session.query(Movie.genre)
+            .filter(Movie.is_active.is_(True), Movie.genre.isnot(None))
+            .distinct().order_by(Movie.genre).all())
+    return [g for (g,) in rows]
+
+# Movie search runs against an FTS5 virtual table on SQLite instead of a
+# leading-wildcard LIKE, which can't use an index and scans the whole
+# catalog. Triggers keep the index in sync with the movie table; on other
+# backends the search falls back to ILIKE.
+_MOVIE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS movie_fts USING fts5(
+        title, director, description, content='movie', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS movie_fts_ai AFTER INSERT ON movie BEGIN
+        INSERT INTO movie_fts(rowid, title, director, description)
+        VALUES (new.id, new.title, new.director, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_fts_ad AFTER DELETE ON movie BEGIN
+        INSERT INTO movie_fts(movie_fts, rowid, title, director, description)
+        VALUES ('delete', old.id, old.title, old.director, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_fts_au AFTER UPDATE ON movie BEGIN
+        INSERT INTO movie_fts(movie_fts, rowid, title, director, description)
+        VALUES ('delete', old.id, old.title, old.director, old.description);
+        INSERT INTO movie_fts(rowid, title, director, description)
+        VALUES (new.id, new.title, new.director, new.description);
+    END""",
+    "INSERT INTO movie_fts(movie_fts) VALUES ('rebuild')",
+)
+
+def _movie_fts_available():
+    return db.engine.url.drivername.startswith("sqlite")
+
+def ensure_movie_fts():
+    """Create (or re-sync) the FTS5 index. Cheap and idempotent."""
+    if not _movie_fts_available():
+        return
+    for stmt in _MOVIE_FTS_DDL:
+        db.session.execute(db.text(stmt))
+    db.session.commit()
+
+def ensure_seat_layout_version():
+    """Add SeatLayout.version to databases created before optimistic
+    locking — create_all only creates missing tables, it never ALTERs."""
+    if not db.engine.url.drivername.startswith("sqlite"):
+        return
+    cols = {row[1] for row in db.session.execute(db.text("PRAGMA table_info(seat_layout)"))}
+    if cols and "version" not in cols:
+        db.session.execute(db.text(
+            "ALTER TABLE seat_layout ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+        db.session.commit()
+
+def search_movie_ids(search_query):
+    """Return matching movie ids via FTS prefix match, or None to fall
+    back to ILIKE (non-SQLite backend or unusable query)."""
+    if not _movie_fts_available():
+        return None
+    terms = re.findall(r"\w+", search_query)
+    if not terms:
+        return None
+    match = " ".join(f'"{t}"*' for t in terms)
+    rows = db.session.execute(
+        db.text("SELECT rowid FROM movie_fts WHERE movie_fts MATCH :q"),
+        {"q": match}).all()
+    return [rowid for (rowid,) in rows]
+
+# Seat codes index straight into these tables (0/1 standard, 2/3 premium,
+# 4/5 VIP — odd means taken), replacing the old if-chains in checkout loops.
+_SEAT_TYPES = ("Standard", "Standard", "Premium", "Premium", "VIP", "VIP")
+_TYPE_CODE = {"Standard": 0, "Premium": 2, "VIP": 4}
+
+@lru_cache(maxsize=1024)
+def _price_vector(price_standard, price_premium, price_vip):
+    return (price_standard, price_standard, price_premium, price_premium, price_vip, price_vip)
+
 def get_seat_type(code):
-    if code in {0, 1}: return "Standard"
-    if code in {2, 3}: return "Premium"
-    if code in {4, 5}: return "VIP"
-    return "Unknown"
+    return _SEAT_TYPES[code] if 0 <= code < 6 else "Unknown"
 
 def get_seat_price(showtime, seat_type):
-    if seat_type == "Premium": return float(showtime.price_premium)
-    if seat_type == "VIP": return float(showtime.price_vip)
-    return float(showtime.price_standard)
+    prices = _price_vector(float(showtime.price_standard), float(showtime.price_premium),
+                           float(showtime.price_vip))
+    return prices[_TYPE_CODE.get(seat_type, 0)]
     
-def generate_ticket_pdf(booking):
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=(8*inch, 4*inch)) # Custom ticket size
-    width, height = (8*inch, 4*inch)
-    bg_color = colors.HexColor("#1e2a38")
-    primary_color = colors.HexColor("#ffffff")
-    secondary_color = colors.HexColor("#a0b0c0")
-    accent_color = colors.HexColor("#ffc107")
-    p.setFillColor(bg_color)
-    p.rect(0, 0, width, height, fill=1, stroke=0)
-    stub_width = 2.5 * inch
-    p.setFillColor(colors.HexColor("#15202b"))
-    p.rect(width - stub_width, 0, stub_width, height, fill=1, stroke=0)
-    p.setFillColor(accent_color)
-    p.rect(0, height - 0.1*inch, width, 0.1*inch, fill=1, stroke=0)
-    p.setFont("Helvetica-Bold", 24)
-    p.setFillColor(primary_color)
-    p.drawString(0.5*inch, height - 0.7*inch, "CineBook")
-
-    poster_path = os.path.join(os.path.dirname(__file__), booking.showtime.movie.poster_url[1:].replace('/', os.sep))
-    try:
-        p.drawImage(poster_path, 0.5*inch, height - 3.5*inch, width=1.5*inch, height=2.25*inch, preserveAspectRatio=True, anchor='n')
-    except Exception:
-        pass
-    
-    qr_data = f"CineBook Booking ID: {booking.id:05d}, Movie: {booking.showtime.movie.title}"
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(qr_data)
+_poster_paths = {}
+
+def _poster_path(poster_url):
+    # Resolve (and stat) each poster once instead of on every ticket render;
+    # returns "" when the file is missing so callers can skip drawImage.
+    # Only hits are cached — a poster uploaded mid-process shouldn't stay
+    # pinned as missing for the process lifetime.
+    path = _poster_paths.get(poster_url)
+    if path is not None:
+        return path
+    if poster_url.startswith("/media/"):
+        # Served by the media route, but stored under the upload folder.
+        candidate = os.path.join(app.config["UPLOAD_FOLDER"],
+                                 poster_url[len("/media/"):].replace('/', os.sep))
+    else:
+        candidate = poster_url.lstrip('/').replace('/', os.sep)
+    if not os.path.isabs(candidate):
+        candidate = os.path.join(os.path.dirname(__file__), candidate)
+    if os.path.isfile(candidate):
+        _poster_paths[poster_url] = candidate
+        return candidate
+    return ""
+
+@lru_cache(maxsize=1024)
+def _render_qr_image(booking_id, title):
+    # The QR payload is deterministic per booking, so repeat downloads and
+    # email resends reuse the rendered image instead of re-encoding. The
+    # 1-bit PIL image is handed straight to ReportLab — no JPEG round-trip.
+    qr = qrcode.QRCode(version=1, box_size=6, border=4)
+    qr.add_data(f"CineBook Booking ID: {booking_id:05d}, Movie: {title}")
     qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white").convert('RGB')
-    qr_buffer = BytesIO()
-    qr_img.save(qr_buffer, format="jpeg")
-    qr_buffer.seek(0)
-
-    main_content_x = 2.5 * inch
-    y_curr = height - 1.2 * inch
-    p.setFont("Helvetica-Bold", 20)
-    p.setFillColor(primary_color)
-    p.drawString(main_content_x, y_curr, booking.showtime.movie.title)
-    y_curr -= 0.5 * inch
-    p.setFont("Helvetica", 11)
-    p.setFillColor(secondary_color)
-    p.drawString(main_content_x, y_curr, "THEATER")
-    p.setFont("Helvetica-Bold", 12)
-    p.setFillColor(primary_color)
-    p.drawString(main_content_x, y_curr - 0.2*inch, f"{booking.showtime.theater.name} | Screen: {booking.showtime.hall}")
-    y_curr -= 0.6 * inch
-    p.setFont("Helvetica", 11)
-    p.setFillColor(secondary_color)
-    p.drawString(main_content_x, y_curr, "SHOWTIME")
-    p.setFont("Helvetica-Bold", 12)
-    p.setFillColor(primary_color)
-    p.drawString(main_content_x, y_curr - 0.2*inch, booking.showtime.time.strftime('%A, %d %B %Y at %I:%M %p'))
-    y_curr -= 0.6 * inch
-    seats_str = ", ".join([f"R{s['row']+1}-S{s['col']+1}" for s in json.loads(booking.seats)])
-    p.setFont("Helvetica", 11)
-    p.setFillColor(secondary_color)
-    p.drawString(main_content_x, y_curr, "SEATS")
-    p.setFont("Helvetica-Bold", 12)
-    p.setFillColor(primary_color)
-    p.drawString(main_content_x, y_curr - 0.2*inch, seats_str)
-    y_curr -= 0.6 * inch
-    food_items = json.loads(booking.food_items) if booking.food_items else []
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+TICKET_PAGESIZE = (8*inch, 4*inch) # Custom ticket size
+
+# The ticket layout is fixed at 8x4in, so every coordinate is resolved once
+# at import; _draw_ticket only substitutes the per-booking strings.
+TICKET_W, TICKET_H = TICKET_PAGESIZE
+_STUB_W = 2.5 * inch
+_STUB_X = TICKET_W - _STUB_W
+_STUB_CENTER = TICKET_W - _STUB_W / 2
+_MARGIN_X = 0.5 * inch
+_MAIN_X = 2.5 * inch
+_LABEL_DY = 0.2 * inch
+_Y_ACCENT = TICKET_H - 0.1 * inch
+_Y_BRAND = TICKET_H - 0.7 * inch
+_Y_TITLE = TICKET_H - 1.2 * inch
+_Y_THEATER = TICKET_H - 1.7 * inch
+_Y_SHOWTIME = TICKET_H - 2.3 * inch
+_Y_SEATS = TICKET_H - 2.9 * inch
+_Y_ORDER = TICKET_H - 3.5 * inch
+_Y_POSTER = TICKET_H - 3.5 * inch
+_Y_QR = TICKET_H - 2.0 * inch
+_Y_STUB_ID_LABEL = TICKET_H - 2.3 * inch
+_Y_STUB_ID = TICKET_H - 2.6 * inch
+_Y_STUB_TOTAL_LABEL = TICKET_H - 3.0 * inch
+_Y_STUB_TOTAL = TICKET_H - 3.3 * inch
+
+def _draw_field(p, y, label, value):
+    p.setFont(TICKET_FONT, 11)
+    p.setFillColor(TICKET_SECONDARY)
+    p.drawString(_MAIN_X, y, label)
+    p.setFont(TICKET_FONT_BOLD, 12)
+    p.setFillColor(TICKET_PRIMARY)
+    p.drawString(_MAIN_X, y - _LABEL_DY, value)
+
+def _draw_ticket(p, booking):
+    p.setFillColor(TICKET_BG)
+    p.rect(0, 0, TICKET_W, TICKET_H, fill=1, stroke=0)
+    p.setFillColor(TICKET_STUB_BG)
+    p.rect(_STUB_X, 0, _STUB_W, TICKET_H, fill=1, stroke=0)
+    p.setFillColor(TICKET_ACCENT)
+    p.rect(0, _Y_ACCENT, TICKET_W, 0.1*inch, fill=1, stroke=0)
+    p.setFont(TICKET_FONT_BOLD, 24)
+    p.setFillColor(TICKET_PRIMARY)
+    p.drawString(_MARGIN_X, _Y_BRAND, "CineBook")
+
+    poster_path = _poster_path(booking.showtime.movie.poster_url)
+    if poster_path:
+        p.drawImage(poster_path, _MARGIN_X, _Y_POSTER, width=1.5*inch, height=2.25*inch, preserveAspectRatio=True, anchor='n')
+
+    p.setFont(TICKET_FONT_BOLD, 20)
+    p.setFillColor(TICKET_PRIMARY)
+    p.drawString(_MAIN_X, _Y_TITLE, booking.showtime.movie.title)
+    _draw_field(p, _Y_THEATER, "THEATER", f"{booking.showtime.theater.name} | Screen: {booking.showtime.hall}")
+    _draw_field(p, _Y_SHOWTIME, "SHOWTIME", booking.showtime.time.strftime('%A, %d %B %Y at %I:%M %p'))
+    seats = booking.seats
+    _draw_field(p, _Y_SEATS, "SEATS", ", ".join(f"R{s['row']+1}-S{s['col']+1}" for s in seats))
+    food_items = booking.food_items or []
     if food_items:
-        food_str = ", ".join([f"{item['name']} (x{item['quantity']})" for item in food_items])
-        p.setFont("Helvetica", 11)
-        p.setFillColor(secondary_color)
-        p.drawString(main_content_x, y_curr, "ORDER")
-        p.setFont("Helvetica-Bold", 12)
-        p.setFillColor(primary_color)
-        p.drawString(main_content_x, y_curr - 0.2*inch, food_str)
-    
-    stub_x = width - stub_width + 0.25*inch
-    p.drawImage(ImageReader(qr_buffer), stub_x, height - 2.0*inch, width=2.0*inch, height=2.0*inch)
-    p.setFont("Helvetica", 10)
-    p.setFillColor(secondary_color)
-    p.drawCentredString(width - stub_width/2, height - 2.3*inch, "BOOKING ID")
-    p.setFont("Helvetica-Bold", 16)
-    p.setFillColor(primary_color)
-    p.drawCentredString(width - stub_width/2, height - 2.6*inch, f"{booking.id:05d}")
-    p.setFont("Helvetica", 10)
-    p.setFillColor(secondary_color)
-    p.drawCentredString(width - stub_width/2, height - 3.0*inch, "TOTAL PAID")
-    p.setFont("Helvetica-Bold", 16)
-    p.setFillColor(accent_color)
-    p.drawCentredString(width - stub_width/2, height - 3.3*inch, f"Rs. {booking.total_price:.2f}")
-
-    p.showPage()
+        _draw_field(p, _Y_ORDER, "ORDER", ", ".join(f"{item['name']} (x{item['quantity']})" for item in food_items))
+
+    qr_reader = ImageReader(_render_qr_image(booking.id, booking.showtime.movie.title))
+    p.drawImage(qr_reader, _STUB_X + 0.25*inch, _Y_QR, width=2.0*inch, height=2.0*inch)
+    p.setFont(TICKET_FONT, 10)
+    p.setFillColor(TICKET_SECONDARY)
+    p.drawCentredString(_STUB_CENTER, _Y_STUB_ID_LABEL, "BOOKING ID")
+    p.setFont(TICKET_FONT_BOLD, 16)
+    p.setFillColor(TICKET_PRIMARY)
+    p.drawCentredString(_STUB_CENTER, _Y_STUB_ID, f"{booking.id:05d}")
+    p.setFont(TICKET_FONT, 10)
+    p.setFillColor(TICKET_SECONDARY)
+    p.drawCentredString(_STUB_CENTER, _Y_STUB_TOTAL_LABEL, "TOTAL PAID")
+    p.setFont(TICKET_FONT_BOLD, 16)
+    p.setFillColor(TICKET_ACCENT)
+    p.drawCentredString(_STUB_CENTER, _Y_STUB_TOTAL, f"Rs. {booking.total_price:.2f}")
+
+def generate_tickets_pdf(bookings):
+    # One canvas for the whole batch: canvas/font setup is paid once and
+    # each booking becomes a page.
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=TICKET_PAGESIZE)
+    for booking in bookings:
+        _draw_ticket(p, booking)
+        p.showPage()
     p.save()
     buffer.seek(0)
     return buffer
 
+def generate_ticket_pdf(booking):
+    return generate_tickets_pdf([booking])
+
+@cache.memoize(timeout=600)
+def _ticket_pdf_bytes(booking_id):
+    # A booking's ticket is immutable once paid, so repeat downloads skip
+    # ReportLab entirely for the cache lifetime.
+    booking = db.session.get(Booking, booking_id)
+    return generate_ticket_pdf(booking).getvalue()
+
+class SmtpPool:
+    """Keeps one authenticated SMTP connection per thread so consecutive
+    sends skip the TLS handshake and AUTH round-trips that dominate the
+    cost of small HTML emails."""
+    IDLE_TIMEOUT = 60
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.noop()
+                self._local.last_used = time.monotonic()
+                return conn
+            except Exception:
+                self.close()
+        conn = smtplib.SMTP(app.config["MAIL_SERVER"], app.config["MAIL_PORT"])
+        conn.starttls()
+        conn.login(app.config["MAIL_USERNAME"], app.config["MAIL_PASSWORD"])
+        self._local.conn = conn
+        self._local.last_used = time.monotonic()
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try: conn.quit()
+            except Exception: pass
+
+    def close_if_idle(self, max_idle=IDLE_TIMEOUT):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and time.monotonic() - getattr(self._local, "last_used", 0) > max_idle:
+            self.close()
+
+smtp_pool = SmtpPool()
+
+# Small pool for post-booking side effects (PDF render + SMTP) so checkout
+# routes can respond without waiting on network I/O.
+EXEC = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cinebook-bg")
+atexit.register(EXEC.shutdown)
+
+def _dispatch_confirmation(booking_id):
+    with app.app_context():
+        booking = db.session.get(Booking, booking_id)
+        if booking is None:
+            return
+        email_body = render_template("email/booking_confirmation.html", user=booking.user, booking=booking)
+        pdf_ticket = generate_ticket_pdf(booking)
+        send_email(booking.user.email, f"Ticket for {booking.showtime.movie.title}",
+                   email_body, pdf_ticket, f"ticket_{booking.id}.pdf")
+
+def _dispatch_cancellation(booking_id):
+    with app.app_context():
+        booking = db.session.get(Booking, booking_id)
+        if booking is None:
+            return
+        email_body = render_template("email/booking_cancellation.html", user=booking.user, booking=booking)
+        send_email(booking.user.email, f"Cancellation for {booking.showtime.movie.title}", email_body)
+
+@app.teardown_appcontext
+def _close_idle_smtp(exc=None):
+    smtp_pool.close_if_idle()
+
 def send_email(recipient, subject, html_body, pdf_attachment=None, filename=None):
     if not all([app.config.get("MAIL_USERNAME"), app.config.get("MAIL_PASSWORD")]):
         app.logger.warning("Email not configured. Skipping email dispatch.")
@@ -320,37 +731,84 @@ def send_email(recipient, subject, html_body, pdf_attachment=None, filename=None
         part.add_header("Content-Disposition", "attachment", filename=filename)
         msg.attach(part)
     try:
-        with smtplib.SMTP(app.config["MAIL_SERVER"], app.config["MAIL_PORT"]) as server:
-            server.starttls()
-            server.login(app.config["MAIL_USERNAME"], app.config["MAIL_PASSWORD"])
-            server.sendmail(app.config["MAIL_USERNAME"], recipient, msg.as_string())
+        try:
+            smtp_pool.get().sendmail(app.config["MAIL_USERNAME"], recipient, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # Stale pooled connection — reconnect once and retry.
+            smtp_pool.close()
+            smtp_pool.get().sendmail(app.config["MAIL_USERNAME"], recipient, msg.as_string())
     except Exception as e:
+        smtp_pool.close()
         app.logger.error(f"Failed to send email to {recipient}: {e}")
 
+def send_emails_bulk(recipients, subject, html_body, pdf_bytes=None, filename=None):
+    # One MIME build for the whole batch: the HTML encode and the PDF
+    # base64 pass happen once, and only the To header changes per
+    # recipient. Pairs with the pooled SMTP connection for reminder blasts.
+    if not all([app.config.get("MAIL_USERNAME"), app.config.get("MAIL_PASSWORD")]):
+        app.logger.warning("Email not configured. Skipping bulk email dispatch.")
+        return
+    msg = MIMEMultipart()
+    msg["From"], msg["Subject"] = app.config["MAIL_USERNAME"], subject
+    msg.attach(MIMEText(html_body, "html"))
+    if pdf_bytes and filename:
+        part = MIMEApplication(pdf_bytes, _subtype="pdf")
+        part.add_header("Content-Disposition", "attachment", filename=filename)
+        msg.attach(part)
+    msg["To"] = ""
+    for recipient in recipients:
+        msg.replace_header("To", recipient)
+        try:
+            try:
+                smtp_pool.get().sendmail(app.config["MAIL_USERNAME"], recipient, msg.as_string())
+            except smtplib.SMTPServerDisconnected:
+                smtp_pool.close()
+                smtp_pool.get().sendmail(app.config["MAIL_USERNAME"], recipient, msg.as_string())
+        except Exception as e:
+            smtp_pool.close()
+            app.logger.error(f"Failed to send email to {recipient}: {e}")
+
+# Bound once at import — ZoneInfo lookups are cached but there's no reason
+# to repeat them per rendered datetime. Stored datetimes are naive UTC.
+UTC = ZoneInfo("UTC")
+IST = ZoneInfo("Asia/Kolkata")
+
 @app.template_filter("to_ist")
 def to_ist_filter(utc_dt):
     if not utc_dt: return None
-    return utc_dt + timedelta(hours=5, minutes=30)
+    return utc_dt.replace(tzinfo=UTC).astimezone(IST)
 
 @app.template_filter("fromjson")
 def from_json_filter(value):
-    try: return json.loads(value)
+    # JSON columns already hand templates a list/dict; only parse strings.
+    if not isinstance(value, (str, bytes)):
+        return value if value is not None else {}
+    try: return orjson.loads(value)
     except: return {}
 
 # ==============================================================================
 # USER-FACING ROUTES
 # ==============================================================================
+@app.route("/media/<path:name>")
+def media_file(name):
+    # Uploaded posters/avatars live under content-hashed names, so browsers
+    # can cache them forever; an edited image gets a new name.
+    response = send_from_directory(app.config['UPLOAD_FOLDER'], name, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route("/")
 def index():
-    theaters = Theater.query.order_by(Theater.name).all()
-    return render_template("index.html", theaters=theaters, user=session.get("user"))
+    return render_template("index.html", theaters=_all_theaters())
 
 @app.route("/theater/<int:theater_id>")
 def theater_movies(theater_id):
     theater = db.get_or_404(Theater, theater_id)
-    movie_ids = [st.movie_id for st in Showtime.query.filter_by(theater_id=theater_id).distinct(Showtime.movie_id)]
-    movies = Movie.query.filter(Movie.id.in_(movie_ids), Movie.is_active == True).all()
-    return render_template("theater_movies.html", theater=theater, movies=movies, user=session.get("user"))
+    movies = (db.session.query(Movie)
+              .join(Showtime, Showtime.movie_id == Movie.id)
+              .filter(Showtime.theater_id == theater_id, Movie.is_active.is_(True))
+              .distinct().all())
+    return render_template("theater_movies.html", theater=theater, movies=movies)
 
 @app.route("/movies")
 def movies():
@@ -358,12 +816,16 @@ def movies():
     selected_genre = request.args.get('genre', 'all')
     query = Movie.query.filter_by(is_active=True)
     if search_query:
-        query = query.filter(Movie.title.ilike(f'%{search_query}%'))
+        fts_ids = search_movie_ids(search_query)
+        if fts_ids is not None:
+            query = query.filter(Movie.id.in_(fts_ids))
+        else:
+            query = query.filter(Movie.title.ilike(f'%{search_query}%'))
     if selected_genre != 'all':
         query = query.filter_by(genre=selected_genre)
     movies_list = query.all()
-    genres = sorted(list(set(m.genre for m in Movie.query.filter_by(is_active=True).all())))
-    return render_template("movies.html", movies=movies_list, user=session.get("user"), 
+    genres = _active_genres()
+    return render_template("movies.html", movies=movies_list,
                            genres=genres, selected_genre=selected_genre, search_query=search_query)
 
 @app.route("/movie/<int:movie_id>")
@@ -372,34 +834,39 @@ def movie_detail(movie_id):
     theater_id = request.args.get('theater_id', type=int)
     theater = db.get_or_404(Theater, theater_id) if theater_id else None
     
-    start_dt = datetime.combine(datetime.now().date(), dtime.min)
+    # Showtimes are stored in UTC (see to_ist), so build the day boundary in
+    # UTC too — the server's local date drifts near midnight offsets and the
+    # plain constant keeps the (movie_id, time) index range-seekable.
+    start_dt = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     showtimes_query = Showtime.query.filter(Showtime.movie_id == movie_id, Showtime.time >= start_dt)
     if theater:
         showtimes_query = showtimes_query.filter_by(theater_id=theater.id)
     
     showtimes = showtimes_query.order_by(Showtime.time).all()
-    showtimes_by_date = {}
-    for st in showtimes:
-        date_str = st.time.strftime("%A, %d %B %Y")
-        showtimes_by_date.setdefault(date_str, []).append(st)
+    # The list is already time-sorted, so group in one pass and format the
+    # (locale-aware, so not free) date label once per day, not per showtime.
+    showtimes_by_date = {day.strftime("%A, %d %B %Y"): list(group)
+                         for day, group in groupby(showtimes, key=lambda st: st.time.date())}
 
     reviews = Review.query.filter_by(movie_id=movie_id).order_by(Review.created_at.desc()).all()
-    avg_rating = db.session.query(db.func.avg(Review.rating)).filter_by(movie_id=movie_id).scalar() or 0
+    # Every rating is already in memory; a separate DB aggregate would be a
+    # pure extra round-trip.
+    avg_rating = sum(r.rating for r in reviews) / len(reviews) if reviews else 0
     user_review = None
     if "user_id" in session:
         user_review = Review.query.filter_by(movie_id=movie_id, user_id=session["user_id"]).first()
         
     return render_template("movie_detail.html", movie=movie, showtimes_by_date=showtimes_by_date, 
                            reviews=reviews, avg_rating=round(avg_rating, 1), user_review=user_review, 
-                           user=session.get("user"), theater=theater)
+                           theater=theater)
 
 @app.route("/showtime/<int:showtime_id>")
 @login_required
 def showtime_detail(showtime_id):
     showtime = db.get_or_404(Showtime, showtime_id)
-    layout = "[]"
-    if showtime.seat_layout: layout = showtime.seat_layout.layout
-    return render_template("showtime.html", showtime=showtime, layout=layout, movie=showtime.movie, user=session.get("user"))
+    layout = get_layout(showtime_id)
+    layout = orjson.dumps(layout, option=orjson.OPT_SERIALIZE_NUMPY).decode() if layout is not None else "[]"
+    return render_template("showtime.html", showtime=showtime, layout=layout, movie=showtime.movie)
 
 @app.route("/create-payment-intent", methods=["POST"])
 @login_required
@@ -411,12 +878,30 @@ def create_payment_intent():
             return jsonify(error={'message': 'Booking session expired'}), 400
         pending_booking = session['pending_booking']
         seat_total = float(pending_booking.get('seat_total', 0))
-        food_total = sum(db.get_or_404(FoodItem, int(item['id'])).price * int(item['quantity']) for item in food_items)
+        # One query for all selected items instead of a SELECT per item
+        # while Stripe (and the user) wait.
+        qty = {int(item['id']): int(item['quantity']) for item in food_items}
+        rows = db.session.query(FoodItem.id, FoodItem.price).filter(FoodItem.id.in_(qty)).all()
+        if len(rows) != len(qty):
+            return jsonify(error={'message': 'Invalid food item selected'}), 400
+        food_total = sum(float(price) * qty[item_id] for item_id, price in rows)
         grand_total = seat_total + food_total
         pending_booking['food_items'] = food_items
         pending_booking['total_price'] = grand_total
         session['pending_booking'] = pending_booking
-        intent = stripe.PaymentIntent.create(amount=int(grand_total * 100), currency='inr')
+        # Derive an idempotency key from the booking contents so retries and
+        # double-clicks reuse one PaymentIntent instead of creating orphans.
+        # Seats are dicts, which don't sort — project to (row, col) first.
+        seat_key = sorted((int(s['row']), int(s['col'])) for s in pending_booking['seats'])
+        key_material = (f"{session['user_id']}:{pending_booking['showtime_id']}:"
+                        f"{seat_key}:{sorted(qty.items())}")
+        key = hashlib.sha256(key_material.encode()).hexdigest()
+        if session.get('pi_key') == key and session.get('pi_secret'):
+            return jsonify({'clientSecret': session['pi_secret']})
+        intent = stripe.PaymentIntent.create(amount=int(grand_total * 100), currency='inr',
+                                             idempotency_key=key)
+        session['pi_key'] = key
+        session['pi_secret'] = intent.client_secret
         return jsonify({'clientSecret': intent.client_secret})
     except Exception as e:
         app.logger.error(f"Error creating payment intent: {e}")
@@ -430,28 +915,46 @@ def payment_success():
         return redirect(url_for('index'))
     
     pb = session.pop('pending_booking')
+    session.pop('pi_key', None)
+    session.pop('pi_secret', None)
     showtime = db.get_or_404(Showtime, int(pb["showtime_id"]))
-    layout_obj = db.get_or_404(SeatLayout, showtime.id)
-    layout = json.loads(layout_obj.layout)
-    
-    for seat in pb["seats"]:
-        r, c = int(seat["row"]), int(seat["col"])
-        if layout[r][c] % 2 != 0:
-            flash(f"Seat R{r+1}C{c+1} was taken. Please try again.", "danger")
-            return redirect(url_for('showtime_detail', showtime_id=showtime.id))
-        layout[r][c] += 1
-    
-    layout_obj.layout = json.dumps(layout)
-    booking = Booking(user_id=session["user_id"], showtime_id=showtime.id, seats=json.dumps(pb["seats"]),
-                      food_items=json.dumps(pb.get('food_items', [])), total_price=pb.get('total_price', 0))
+    seats = [(int(s["row"]), int(s["col"])) for s in pb["seats"]]
+
+    # Optimistic concurrency: read the layout, flip the requested seats, and
+    # apply with an UPDATE guarded on the version we read. A concurrent
+    # booking bumps the version, rowcount comes back 0, and we re-validate
+    # against the fresh grid.
+    for _ in range(3):
+        layout_obj = SeatLayout.query.filter_by(showtime_id=showtime.id).first_or_404()
+        layout = decode_layout(layout_obj.layout, showtime.rows, showtime.cols)
+        for r, c in seats:
+            if layout[r][c] % 2 != 0:
+                db.session.rollback()
+                flash(f"Seat R{r+1}C{c+1} was taken. Please try again.", "danger")
+                return redirect(url_for('showtime_detail', showtime_id=showtime.id))
+            layout[r][c] += 1
+        updated = db.session.execute(
+            db.update(SeatLayout)
+            .where(SeatLayout.showtime_id == showtime.id,
+                   SeatLayout.version == layout_obj.version)
+            .values(layout=encode_layout(layout), version=SeatLayout.version + 1))
+        if updated.rowcount == 1:
+            break
+        db.session.expire(layout_obj)
+        invalidate_layout(showtime.id)
+    else:
+        db.session.rollback()
+        flash("Could not reserve your seats, please try again.", "danger")
+        return redirect(url_for('showtime_detail', showtime_id=showtime.id))
+
+    booking = Booking(user_id=session["user_id"], showtime_id=showtime.id, seats=pb["seats"],
+                      food_items=pb.get('food_items', []), total_price=pb.get('total_price', 0))
     db.session.add(booking)
     db.session.commit()
-    
-    user = db.session.get(User, session["user_id"])
-    email_body = render_template("email/booking_confirmation.html", user=user, booking=booking)
-    pdf_ticket = generate_ticket_pdf(booking)
-    send_email(user.email, f"Ticket for {showtime.movie.title}", email_body, pdf_ticket, f"ticket_{booking.id}.pdf")
-    
+    invalidate_layout(showtime.id)
+
+    EXEC.submit(_dispatch_confirmation, booking.id)
+
     return redirect(url_for('booking_confirmation', booking_id=booking.id))
 
 @app.route("/booking-confirmation/<int:booking_id>")
@@ -462,13 +965,16 @@ def booking_confirmation(booking_id):
     if booking.user_id != session.get("user_id") and not is_admin:
         flash("Unauthorized access.", "danger")
         return redirect(url_for("index"))
-    return render_template("booking_confirmation.html", booking=booking, user=session.get("user"))
+    return render_template("booking_confirmation.html", booking=booking)
 
 @app.route("/my_bookings")
 @login_required
 def my_bookings():
-    bookings = Booking.query.filter_by(user_id=session["user_id"]).order_by(Booking.booking_time.desc()).all()
-    return render_template("my_bookings.html", bookings=bookings, now=datetime.utcnow(), buffer_time=timedelta(hours=2), user=session.get("user"))
+    bookings = (Booking.query.filter_by(user_id=session["user_id"])
+                .options(joinedload(Booking.showtime).joinedload(Showtime.movie),
+                         joinedload(Booking.showtime).joinedload(Showtime.theater))
+                .order_by(Booking.booking_time.desc()).all())
+    return render_template("my_bookings.html", bookings=bookings, now=datetime.utcnow(), buffer_time=timedelta(hours=2))
 
 @app.route("/download_ticket/<int:booking_id>")
 @login_required
@@ -478,8 +984,10 @@ def download_ticket(booking_id):
     if booking.user_id != session["user_id"] and not is_admin:
         flash("Unauthorized.", "danger")
         return redirect(url_for("my_bookings"))
-    pdf_buffer = generate_ticket_pdf(booking)
-    return send_file(pdf_buffer, as_attachment=True, download_name=f"Ticket_{booking.id}.pdf", mimetype="application/pdf")
+    pdf_buffer = BytesIO(_ticket_pdf_bytes(booking.id))
+    return send_file(pdf_buffer, as_attachment=True, download_name=f"Ticket_{booking.id}.pdf",
+                     mimetype="application/pdf", conditional=True,
+                     etag=f"ticket-{booking.id}", last_modified=booking.booking_time)
 
 @app.route("/booking/<int:booking_id>/cancel")
 @login_required
@@ -496,17 +1004,14 @@ def cancel_booking(booking_id):
         return redirect(url_for("my_bookings"))
 
     booking.status = "cancelled"
-    layout_obj = SeatLayout.query.filter_by(showtime_id=booking.showtime_id).first()
-    if layout_obj:
-        layout = json.loads(layout_obj.layout)
-        for seat in json.loads(booking.seats):
-            r, c = int(seat["row"]), int(seat["col"])
-            if layout[r][c] % 2 != 0: layout[r][c] -= 1
-        layout_obj.layout = json.dumps(layout)
+    released = _release_seats(booking.showtime_id, booking.seats)
     db.session.commit()
-    user = db.session.get(User, session["user_id"])
-    email_body = render_template("email/booking_cancellation.html", user=user, booking=booking)
-    send_email(user.email, f"Cancellation for {booking.showtime.movie.title}", email_body)
+    invalidate_layout(booking.showtime_id)
+    if not released:
+        flash("Booking cancelled, but the seats could not be freed automatically. "
+              "Please contact support.", "warning")
+        return redirect(url_for("my_bookings"))
+    EXEC.submit(_dispatch_cancellation, booking.id)
     flash("Booking cancelled.", "success")
     return redirect(url_for("my_bookings"))
 
@@ -515,7 +1020,15 @@ def cancel_booking(booking_id):
 def start_booking():
     data = request.get_json()
     showtime = db.get_or_404(Showtime, data['showtime_id'])
-    session['pending_booking'] = {'showtime_id': data['showtime_id'], 'seats': data['seats'], 'seat_total': data['total_price']}
+    # Price the selection server-side from the seat codes rather than
+    # trusting the client-supplied total. get_layout returns an ndarray, so
+    # check for None explicitly — truth-testing an array raises.
+    layout = get_layout(showtime.id)
+    if layout is None:
+        return jsonify({"error": "Seat layout not found"}), 404
+    codes = [layout[int(s['row'])][int(s['col'])] for s in data['seats']]
+    seat_total = sum_seat_prices(showtime, codes)
+    session['pending_booking'] = {'showtime_id': data['showtime_id'], 'seats': data['seats'], 'seat_total': seat_total}
     return jsonify({"success": True, "redirect_url": url_for('add_food_to_booking')})
 
 @app.route("/booking/add-food")
@@ -527,7 +1040,7 @@ def add_food_to_booking():
     pb = session['pending_booking']
     showtime = db.get_or_404(Showtime, pb['showtime_id'])
     food_items = FoodItem.query.filter_by(is_active=True).order_by(FoodItem.category).all()
-    return render_template("food_selection.html", user=session.get("user"), showtime=showtime,
+    return render_template("food_selection.html", showtime=showtime,
                            pending_booking=pb, food_items=food_items, stripe_publishable_key=app.config["STRIPE_PUBLISHABLE_KEY"])
 
 @app.route("/register", methods=["GET", "POST"])
@@ -538,12 +1051,22 @@ def register():
         if User.query.filter((User.username == username) | (User.email == email)).first():
             flash("Username or email already exists.", "danger")
             return redirect(url_for("register"))
-        otp = random.randint(1000, 9999)
-        session['registration_data'] = {
+        # OTP from the CSPRNG, and no password hashing yet — abandoned or bot
+        # registrations shouldn't cost a few hundred ms of hash CPU each.
+        # The hash happens once, in verify_otp, after the email is proven.
+        otp = secrets.randbelow(9000) + 1000
+        reg_data = {
             'username': username, 'email': email, 'full_name': request.form.get("full_name"), 'phone': request.form.get("phone"),
-            'password_hash': generate_password_hash(request.form["password"]), 'otp': otp,
-            'otp_expiry': (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+            'otp': otp, 'otp_expiry': (datetime.utcnow() + timedelta(minutes=10)).isoformat()
         }
+        # Deferring only works with server-side sessions: the default cookie
+        # session is signed, not encrypted, so it must never carry the
+        # plaintext password. Hash up front when sessions ride the cookie.
+        if app.config.get("SESSION_TYPE") == "redis":
+            reg_data['password'] = request.form["password"]
+        else:
+            reg_data['password_hash'] = generate_password_hash(request.form["password"], method="scrypt")
+        session['registration_data'] = reg_data
         email_body = render_template("email/otp_verification.html", otp=otp)
         send_email(email, "Your CineBook Verification Code", email_body)
         flash("Verification code sent to your email.", "info")
@@ -563,7 +1086,11 @@ def verify_otp():
             return redirect(url_for('register'))
         if request.form.get("otp") and int(request.form.get("otp")) == reg_data['otp']:
             user = User(username=reg_data['username'], email=reg_data['email'], full_name=reg_data.get('full_name'),
-                        phone=reg_data.get('phone'), password_hash=reg_data['password_hash'])
+                        phone=reg_data.get('phone'))
+            if 'password_hash' in reg_data:
+                user.password_hash = reg_data['password_hash']
+            else:
+                user.set_password(reg_data['password'])
             db.session.add(user)
             db.session.commit()
             session.pop('registration_data', None)
@@ -573,13 +1100,23 @@ def verify_otp():
             flash("Invalid OTP.", "danger")
     return render_template("verify_otp.html", email=reg_data.get('email'))
 
+def _session_user(user):
+    # Everything profile-ish routes need without re-fetching the User row.
+    return {"id": user.id, "username": user.username, "role": user.role,
+            "avatar": user.avatar, "email": user.email, "full_name": user.full_name}
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         user = User.query.filter_by(username=request.form["username"]).first()
         if user and user.check_password(request.form["password"]):
+            # Transparently upgrade accounts still on werkzeug's expensive
+            # pbkdf2 default to scrypt while the plaintext is in hand.
+            if user.password_hash.startswith("pbkdf2:"):
+                user.set_password(request.form["password"])
+                db.session.commit()
             session["user_id"] = user.id
-            session["user"] = {"id": user.id, "username": user.username, "role": user.role, "avatar": user.avatar}
+            session["user"] = _session_user(user)
             return redirect(url_for("index"))
         flash("Invalid credentials.", "danger")
     return render_template("login.html")
@@ -603,7 +1140,7 @@ def authorize_google():
             db.session.add(user)
             db.session.commit()
         session["user_id"] = user.id
-        session["user"] = {"id": user.id, "username": user.username, "role": user.role, "avatar": user.avatar}
+        session["user"] = _session_user(user)
         return redirect(url_for("index"))
     except Exception as e:
         app.logger.error(f"Google Auth Error: {e}")
@@ -666,27 +1203,31 @@ def edit_profile():
     if 'avatar' in request.files:
         file = request.files['avatar']
         if file and allowed_file(file.filename):
-            filename = f"user_{user.id}_{secure_filename(file.filename)}"
-            avatar_path = os.path.join(app.config['UPLOAD_FOLDER'], 'avatars', filename)
-            file.save(avatar_path)
-            user.avatar = url_for('static', filename=f'uploads/avatars/{filename}')
+            base = os.path.splitext(secure_filename(file.filename))[0]
+            avatar_url = save_uploaded_image(file, subfolder='avatars', max_side=512,
+                                             basename=f"user_{user.id}_{base}")
+            if avatar_url:
+                user.avatar = avatar_url
     db.session.commit()
-    session["user"]["avatar"] = user.avatar
-    session.modified = True
+    # Reassign the whole blob so the cookie session notices the change.
+    session["user"] = _session_user(user)
     flash("Profile updated.", "success")
     return redirect(url_for("profile"))
 
 @app.route("/profile/change_password", methods=["POST"])
 @login_required
 def change_password():
-    user = db.session.get(User, session["user_id"])
-    if not user.check_password(request.form.get("current_password")):
+    # Only the hash is needed to verify, so skip hydrating the full User row.
+    stored_hash = db.session.query(User.password_hash).filter_by(id=session["user_id"]).scalar()
+    if not (stored_hash and check_password_hash(stored_hash, request.form.get("current_password", ""))):
         flash("Incorrect current password.", "danger")
         return redirect(url_for("profile"))
     if request.form.get("new_password") != request.form.get("confirm_password"):
         flash("New passwords don't match.", "danger")
         return redirect(url_for("profile"))
-    user.set_password(request.form.get("new_password"))
+    db.session.execute(
+        db.update(User).where(User.id == session["user_id"])
+        .values(password_hash=generate_password_hash(request.form.get("new_password"), method="scrypt")))
     db.session.commit()
     flash("Password changed.", "success")
     return redirect(url_for("profile"))
@@ -714,26 +1255,43 @@ def add_review(movie_id):
 # ==============================================================================
 # ADMIN ROUTES
 # ==============================================================================
+@cache.cached(timeout=30, key_prefix="dashboard_totals")
+def _dashboard_totals():
+    # Four scalar subqueries in one SELECT — one round-trip instead of four
+    # serial aggregates — and a short TTL since the dashboard doesn't need
+    # second-level freshness.
+    return tuple(db.session.execute(db.select(
+        db.select(db.func.count()).select_from(Movie).scalar_subquery(),
+        db.select(db.func.count()).select_from(Booking).scalar_subquery(),
+        db.select(db.func.count()).select_from(User).scalar_subquery(),
+        db.select(db.func.coalesce(db.func.sum(Booking.total_price), 0))
+          .where(Booking.status == 'confirmed').scalar_subquery(),
+    )).one())
+
+
 @app.route("/admin")
-@admin_required
 def admin_dashboard():
-    total_movies = Movie.query.count()
-    total_bookings = Booking.query.count()
-    total_users = User.query.count()
-    total_revenue = db.session.query(db.func.sum(Booking.total_price)).filter(Booking.status == 'confirmed').scalar() or 0
-    recent_bookings = Booking.query.order_by(Booking.booking_time.desc()).limit(5).all()
+    total_movies, total_bookings, total_users, total_revenue = _dashboard_totals()
+    # selectinload keeps LIMIT 5 exact (joins would need a subquery) and
+    # replaces the 15 lazy per-row SELECTs the template would otherwise fire.
+    recent_bookings = (Booking.query
+                       .options(selectinload(Booking.user),
+                                selectinload(Booking.showtime).selectinload(Showtime.movie),
+                                selectinload(Booking.showtime).selectinload(Showtime.theater))
+                       .order_by(Booking.booking_time.desc()).limit(5).all())
     return render_template("admin/dashboard.html", total_movies=total_movies, total_bookings=total_bookings,
                            total_users=total_users, total_revenue=round(total_revenue, 2), 
-                           recent_bookings=recent_bookings, user=session.get("user"))
+                           recent_bookings=recent_bookings)
 
 @app.route("/admin/movies")
-@admin_required
 def admin_movies():
-    movies = Movie.query.all()
-    return render_template("admin/movies.html", movies=movies, user=session.get("user"))
+    # The table only shows a handful of columns; skip description/cast/trailer.
+    movies = Movie.query.options(load_only(
+        Movie.title, Movie.genre, Movie.duration, Movie.rating,
+        Movie.poster_url, Movie.is_active)).all()
+    return render_template("admin/movies.html", movies=movies)
 
 @app.route("/admin/movies/add", methods=['GET', 'POST'])
-@admin_required
 def admin_add_movie():
     if request.method == 'POST':
         title = request.form.get('title')
@@ -744,9 +1302,7 @@ def admin_add_movie():
         if 'poster' in request.files:
             file = request.files['poster']
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                poster_url = url_for('static', filename=f'uploads/{filename}')
+                poster_url = save_uploaded_image(file) or poster_url
         new_movie = Movie(
             title=title, genre=request.form.get('genre'), duration=request.form.get('duration', type=int),
             language=request.form.get('language'), rating=request.form.get('rating', type=float),
@@ -754,12 +1310,12 @@ def admin_add_movie():
             trailer_url=request.form.get('trailer_url'), description=request.form.get('description'), poster_url=poster_url)
         db.session.add(new_movie)
         db.session.commit()
+        cache.delete_memoized(_active_genres)
         flash('Movie added successfully!', 'success')
         return redirect(url_for('admin_movies'))
-    return render_template("admin/add_movie.html", user=session.get("user"))
+    return render_template("admin/add_movie.html")
 
 @app.route('/admin/movies/edit/<int:movie_id>', methods=['GET', 'POST'])
-@admin_required
 def admin_edit_movie(movie_id):
     movie = db.get_or_404(Movie, movie_id)
     if request.method == 'POST':
@@ -777,33 +1333,33 @@ def admin_edit_movie(movie_id):
         if 'poster' in request.files:
             file = request.files['poster']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                movie.poster_url = url_for('static', filename=f'uploads/{filename}')
+                movie.poster_url = save_uploaded_image(file) or movie.poster_url
         
         db.session.commit()
+        cache.delete_memoized(_active_genres)
         flash('Movie updated successfully.', 'success')
         return redirect(url_for('admin_movies'))
         
-    return render_template('admin/edit_movie.html', movie=movie, user=session.get("user"))
+    return render_template('admin/edit_movie.html', movie=movie)
 
 @app.route('/admin/movies/delete/<int:movie_id>', methods=['POST'])
-@admin_required
 def admin_delete_movie(movie_id):
     movie = db.get_or_404(Movie, movie_id)
     db.session.delete(movie)
     db.session.commit()
+    cache.delete_memoized(_active_genres)
     flash('Movie has been deleted.', 'success')
     return redirect(url_for('admin_movies'))
 
 @app.route("/admin/showtimes")
-@admin_required
 def admin_showtimes():
-    showtimes = Showtime.query.order_by(Showtime.time.desc()).all()
-    return render_template("admin/showtimes.html", showtimes=showtimes, user=session.get("user"))
+    showtimes = Showtime.query.options(
+        joinedload(Showtime.movie).load_only(Movie.title),
+        joinedload(Showtime.theater).load_only(Theater.name),
+    ).order_by(Showtime.time.desc()).all()
+    return render_template("admin/showtimes.html", showtimes=showtimes)
 
 @app.route("/admin/showtimes/add", methods=['GET', 'POST'])
-@admin_required
 def admin_add_showtime():
     if request.method == 'POST':
         showtime = Showtime(
@@ -819,17 +1375,16 @@ def admin_add_showtime():
         db.session.add(showtime)
         db.session.flush()
         layout_data = create_seat_layout(showtime.rows, showtime.cols)
-        seat_layout = SeatLayout(showtime_id=showtime.id, layout=json.dumps(layout_data))
+        seat_layout = SeatLayout(showtime_id=showtime.id, layout=encode_layout(layout_data))
         db.session.add(seat_layout)
         db.session.commit()
         flash('Showtime added successfully!', 'success')
         return redirect(url_for('admin_showtimes'))
     movies = Movie.query.filter_by(is_active=True).all()
     theaters = Theater.query.all()
-    return render_template("admin/add_showtime.html", movies=movies, theaters=theaters, user=session.get("user"))
+    return render_template("admin/add_showtime.html", movies=movies, theaters=theaters)
 
 @app.route('/admin/showtimes/edit/<int:showtime_id>', methods=['GET', 'POST'])
-@admin_required
 def admin_edit_showtime(showtime_id):
     showtime = db.get_or_404(Showtime, showtime_id)
     if request.method == 'POST':
@@ -845,10 +1400,9 @@ def admin_edit_showtime(showtime_id):
         return redirect(url_for('admin_showtimes'))
     movies = Movie.query.filter_by(is_active=True).all()
     theaters = Theater.query.all()
-    return render_template('admin/edit_showtime.html', showtime=showtime, movies=movies, theaters=theaters, user=session.get("user"))
+    return render_template('admin/edit_showtime.html', showtime=showtime, movies=movies, theaters=theaters)
 
 @app.route('/admin/showtimes/delete/<int:showtime_id>', methods=['POST'])
-@admin_required
 def admin_delete_showtime(showtime_id):
     showtime = db.get_or_404(Showtime, showtime_id)
     db.session.delete(showtime)
@@ -857,38 +1411,40 @@ def admin_delete_showtime(showtime_id):
     return redirect(url_for('admin_showtimes'))
 
 @app.route("/admin/bookings")
-@admin_required
 def admin_bookings():
-    bookings = Booking.query.order_by(Booking.booking_time.desc()).all()
-    return render_template("admin/bookings.html", bookings=bookings, user=session.get("user"))
+    bookings = (Booking.query
+                .options(joinedload(Booking.showtime).joinedload(Showtime.movie),
+                         joinedload(Booking.showtime).joinedload(Showtime.theater),
+                         joinedload(Booking.user))
+                .order_by(Booking.booking_time.desc()).all())
+    return render_template("admin/bookings.html", bookings=bookings)
 
 @app.route('/admin/bookings/cancel/<int:booking_id>', methods=['POST'])
-@admin_required
 def admin_cancel_booking(booking_id):
     booking = db.get_or_404(Booking, booking_id)
     if booking.status != 'cancelled':
         booking.status = 'cancelled'
-        layout_obj = SeatLayout.query.filter_by(showtime_id=booking.showtime_id).first()
-        if layout_obj:
-            layout = json.loads(layout_obj.layout)
-            for seat in json.loads(booking.seats):
-                r, c = int(seat["row"]), int(seat["col"])
-                if layout[r][c] % 2 != 0: layout[r][c] -= 1
-            layout_obj.layout = json.dumps(layout)
+        released = _release_seats(booking.showtime_id, booking.seats)
         db.session.commit()
-        flash(f"Booking #{booking.id} has been cancelled.", 'success')
+        invalidate_layout(booking.showtime_id)
+        if released:
+            flash(f"Booking #{booking.id} has been cancelled.", 'success')
+        else:
+            flash(f"Booking #{booking.id} cancelled, but its seats could not be freed — "
+                  "check the seat layout.", 'warning')
     else:
         flash(f"Booking #{booking.id} was already cancelled.", 'info')
     return redirect(url_for('admin_bookings'))
 
 @app.route("/admin/users")
-@admin_required
 def admin_users():
-    users = User.query.all()
-    return render_template("admin/users.html", users=users, user=session.get("user"))
+    # Leave password/reset-token columns out of the listing query.
+    users = User.query.options(load_only(
+        User.username, User.email, User.full_name, User.avatar,
+        User.role, User.provider, User.created_at)).all()
+    return render_template("admin/users.html", users=users)
 
 @app.route('/admin/users/delete/<int:user_id>', methods=['POST'])
-@admin_required
 def admin_delete_user(user_id):
     user = db.get_or_404(User, user_id)
     if user.role == 'admin':
@@ -900,13 +1456,11 @@ def admin_delete_user(user_id):
     return redirect(url_for('admin_users'))
 
 @app.route("/admin/get-booking-details/<int:booking_id>")
-@admin_required
 def admin_get_booking_details(booking_id):
     booking = Booking.query.get(booking_id)
     return render_template("admin/booking_details_partial.html", booking=booking)
 
 @app.route("/admin/mark-attended/<int:booking_id>", methods=["POST"])
-@admin_required
 def admin_mark_attended(booking_id):
     booking = db.get_or_404(Booking, booking_id)
     if not booking.attended:
@@ -918,7 +1472,6 @@ def admin_mark_attended(booking_id):
     return redirect(url_for('admin_verify_ticket', booking_id=booking_id))
 
 @app.route("/admin/verify-ticket", methods=["GET", "POST"])
-@admin_required
 def admin_verify_ticket():
     booking = None
     booking_id = request.args.get('booking_id')
@@ -928,16 +1481,15 @@ def admin_verify_ticket():
         booking = Booking.query.get(int(booking_id))
         if not booking:
             flash(f"Booking ID {booking_id} not found.", "danger")
-    return render_template("admin/verify_ticket.html", user=session.get("user"), booking=booking)
+    return render_template("admin/verify_ticket.html", booking=booking)
 
 @app.route("/admin/food")
-@admin_required
 def admin_food_items():
-    items = FoodItem.query.all()
-    return render_template("admin/food_items.html", items=items, user=session.get("user"))
+    items = FoodItem.query.options(load_only(
+        FoodItem.name, FoodItem.price, FoodItem.category, FoodItem.is_active)).all()
+    return render_template("admin/food_items.html", items=items)
 
 @app.route("/admin/food/add", methods=['GET', 'POST'])
-@admin_required
 def admin_add_food_item():
     if request.method == 'POST':
         new_item = FoodItem(name=request.form.get('name'), description=request.form.get('description'),
@@ -947,10 +1499,9 @@ def admin_add_food_item():
         db.session.commit()
         flash('Food item added.', 'success')
         return redirect(url_for('admin_food_items'))
-    return render_template("admin/add_edit_food_item.html", action="Add", item=None, user=session.get("user"))
+    return render_template("admin/add_edit_food_item.html", action="Add", item=None)
 
 @app.route("/admin/food/edit/<int:item_id>", methods=['GET', 'POST'])
-@admin_required
 def admin_edit_food_item(item_id):
     item = db.get_or_404(FoodItem, item_id)
     if request.method == 'POST':
@@ -960,10 +1511,9 @@ def admin_edit_food_item(item_id):
         db.session.commit()
         flash('Food item updated.', 'success')
         return redirect(url_for('admin_food_items'))
-    return render_template("admin/add_edit_food_item.html", action="Edit", item=item, user=session.get("user"))
+    return render_template("admin/add_edit_food_item.html", action="Edit", item=item)
 
 @app.route("/admin/food/delete/<int:item_id>", methods=['POST'])
-@admin_required
 def admin_delete_food_item(item_id):
     item = db.get_or_404(FoodItem, item_id)
     db.session.delete(item)
@@ -974,82 +1524,146 @@ def admin_delete_food_item(item_id):
 # ==============================================================================
 # DATABASE INITIALIZATION & APP EXECUTION
 # ==============================================================================
+# Cast lists for the seed movies, serialized once at import instead of on
+# every init_db call.
+_AVATAR_CAST = json.dumps(["Sam Worthington", "Zoe Saldaña"])
+_JOHN_WICK_CAST = json.dumps(["Keanu Reeves", "Donnie Yen"])
+_OPPENHEIMER_CAST = json.dumps(["Cillian Murphy", "Emily Blunt"])
+_MARIO_CAST = json.dumps(["Chris Pratt", "Anya Taylor-Joy"])
+
+# Literal seed rows live at module scope so init_db re-entry (tests,
+# forked workers) does not rebuild them; insert() consumes them as-is.
+_THEATER_SEED = [
+    {"name": "ARRS Multiplex", "address": "2/1, Omalur Main Road, Near New Bus Stand", "city": "Salem", "image_url": "/static/images/theaters/arrs.jpg"},
+    {"name": "INOX Cinemas", "address": "Reliance Mall, Omalur Main Road", "city": "Salem", "image_url": "/static/images/theaters/inox.jpg"},
+    {"name": "Kailash Prakash Theatre", "address": "Trichy Main Road, Dadagapatti", "city": "Salem", "image_url": "/static/images/theaters/kailash.jpg"},
+    {"name": "Sapna Cinemas", "address": "Four Roads", "city": "Salem", "image_url": "/static/images/theaters/sapna.jpg"},
+    {"name": "Santham Theatre", "address": "Omalur Main Road", "city": "Salem", "image_url": "/static/images/theaters/santham.jpg"},
+]
+
+_MOVIE_SEED = [
+    {"title": "Avatar: The Way of Water", "genre": "Sci-Fi", "duration": 192, "rating": 8.5, "description": "Jake Sully and Ney'tiri have formed a family...", "poster_url": "/static/images/avatar.jpg", "cast": _AVATAR_CAST, "director": "James Cameron"},
+    {"title": "John Wick: Chapter 4", "genre": "Action", "duration": 169, "rating": 8.2, "description": "John Wick takes his fight against the High Table global...", "poster_url": "/static/images/johnwick.jpg", "cast": _JOHN_WICK_CAST, "director": "Chad Stahelski"},
+    {"title": "Oppenheimer", "genre": "Biographical", "duration": 180, "rating": 9.0, "description": "The story of American scientist J. Robert Oppenheimer...", "poster_url": "/static/images/oppenheimer.jpg", "cast": _OPPENHEIMER_CAST, "director": "Christopher Nolan"},
+    {"title": "The Super Mario Bros. Movie", "genre": "Animation", "duration": 92, "rating": 7.8, "description": "The story of The Super Mario Bros. on their journey through the Mushroom Kingdom.", "poster_url": "/static/images/mario.jpg", "cast": _MARIO_CAST, "director": "Aaron Horvath"},
+]
+
+_FOOD_SEED = [
+    {"name": "Salted Popcorn (Large)", "description": "Classic salted popcorn.", "price": 180.00, "category": "Snacks", "image_url": "/static/images/food/popcorn.jpg"},
+    {"name": "Caramel Popcorn (Large)", "description": "Sweet and crunchy caramel popcorn.", "price": 220.00, "category": "Snacks", "image_url": "/static/images/food/caramel-popcorn.jpg"},
+    {"name": "Nachos with Cheese Dip", "description": "Crispy nachos served with a warm cheese dip.", "price": 160.00, "category": "Snacks", "image_url": "/static/images/food/nachos.jpg"},
+    {"name": "Coca-Cola (500ml)", "description": "Chilled soft drink.", "price": 90.00, "category": "Drinks", "image_url": "/static/images/food/coke.jpg"},
+    {"name": "Pepsi (500ml)", "description": "Chilled soft drink.", "price": 90.00, "category": "Drinks", "image_url": "/static/images/food/pepsi.jpg"},
+    {"name": "Classic Combo", "description": "1 Salted Popcorn + 1 Coke", "price": 250.00, "category": "Combo", "image_url": "/static/images/food/combo.jpg"},
+]
+
+# Daily show slots for seeded showtimes.
+SHOWTIME_TIMES = (dtime(10, 30), dtime(14, 0), dtime(18, 30), dtime(22, 0))
+
+# Encoded once at import: every seeded hall is the same 8x12 grid with
+# premium rows 6-7 and a VIP back row, so all SeatLayout rows share one blob.
+_DEFAULT_LAYOUT = encode_layout(create_seat_layout(8, 12, seat_categories={
+    "premium": [(r, c) for r in range(5, 7) for c in range(12)],
+    "vip": [(r, c) for r in range(7, 8) for c in range(12)],
+}))
+
 def init_db():
-    if Theater.query.count() > 0: 
+    # Both bootstraps run on every startup and are idempotent, so databases
+    # created before the FTS index or the version column catch up here.
+    ensure_movie_fts()
+    ensure_seat_layout_version()
+    # EXISTS short-circuits at the first row; this check is the only DB work
+    # init_db does on a warm start.
+    if db.session.query(Theater.query.exists()).scalar():
         return
         
-    print("Seeding database with initial data...")
-    theaters_data = [
-        Theater(name="ARRS Multiplex", address="2/1, Omalur Main Road, Near New Bus Stand", city="Salem", image_url="/static/images/theaters/arrs.jpg"),
-        Theater(name="INOX Cinemas", address="Reliance Mall, Omalur Main Road", city="Salem", image_url="/static/images/theaters/inox.jpg"),
-        Theater(name="Kailash Prakash Theatre", address="Trichy Main Road, Dadagapatti", city="Salem", image_url="/static/images/theaters/kailash.jpg"),
-        Theater(name="Sapna Cinemas", address="Four Roads", city="Salem", image_url="/static/images/theaters/sapna.jpg"),
-        Theater(name="Santham Theatre", address="Omalur Main Road", city="Salem", image_url="/static/images/theaters/santham.jpg"),
-    ]
-    db.session.bulk_save_objects(theaters_data)
-    db.session.commit()
+    # Autoflush probes walk the identity map before every query; nothing
+    # here relies on it, so skip that work for the whole seeding pass.
+    with db.session.no_autoflush:
+        app.logger.info("Seeding database with initial data...")
+        theaters_data = list(_THEATER_SEED)
+        # 2.0-style executemany insert: one batched INSERT ... RETURNING hands the
+        # generated ids straight back for the showtime loop below.
+        theater_ids = db.session.execute(
+            db.insert(Theater).returning(Theater.id), theaters_data).scalars().all()
+
+        admin = User(username="admin", email="admin@app.com", role="admin")
+        admin.set_password("admin")
+        user1 = User(username="testuser", email="user@app.com", role="user")
+        user1.set_password("password")
+        db.session.add_all([admin, user1])
     
-    admin = User(username="admin", email="admin@app.com", role="admin")
-    admin.set_password("admin")
-    user1 = User(username="testuser", email="user@app.com", role="user")
-    user1.set_password("password")
-    db.session.add_all([admin, user1])
-    
-    movies_data = [
-        Movie(title="Avatar: The Way of Water", genre="Sci-Fi", duration=192, rating=8.5, description="Jake Sully and Ney'tiri have formed a family...", poster_url="/static/images/avatar.jpg", cast=json.dumps(["Sam Worthington", "Zoe Saldaña"]), director="James Cameron"),
-        Movie(title="John Wick: Chapter 4", genre="Action", duration=169, rating=8.2, description="John Wick takes his fight against the High Table global...", poster_url="/static/images/johnwick.jpg", cast=json.dumps(["Keanu Reeves", "Donnie Yen"]), director="Chad Stahelski"),
-        Movie(title="Oppenheimer", genre="Biographical", duration=180, rating=9.0, description="The story of American scientist J. Robert Oppenheimer...", poster_url="/static/images/oppenheimer.jpg", cast=json.dumps(["Cillian Murphy", "Emily Blunt"]), director="Christopher Nolan"),
-        Movie(title="The Super Mario Bros. Movie", genre="Animation", duration=92, rating=7.8, description="The story of The Super Mario Bros. on their journey through the Mushroom Kingdom.", poster_url="/static/images/mario.jpg", cast=json.dumps(["Chris Pratt", "Anya Taylor-Joy"]), director="Aaron Horvath"),
-    ]
-    db.session.bulk_save_objects(movies_data)
-    db.session.commit() 
-
-    movies = Movie.query.all()
-    theaters = Theater.query.all()
-    halls = ["Screen 1", "Screen 2", "Screen 3", "Audi 1"]
-    today = datetime.now().date()
-    
-    for i in range(3):
-        current_date = today + timedelta(days=i)
-        for theater in theaters:
-            movies_for_theater = random.sample(movies, k=random.randint(2, 3))
-            for movie in movies_for_theater:
-                showtime_times = [dtime(10, 30), dtime(14, 0), dtime(18, 30), dtime(22, 0)]
-                for st_time in showtime_times:
-                    showtime_dt = datetime.combine(current_date, st_time)
-                    
-                    showtime = Showtime(movie_id=movie.id, theater_id=theater.id, time=showtime_dt, hall=random.choice(halls), rows=8, cols=12, price_standard=180.0, price_premium=250.0, price_vip=400.0)
-                    db.session.add(showtime)
-                    db.session.flush()
-                    
-                    seat_categories = {
-                        "premium": [(r, c) for r in range(5, 7) for c in range(showtime.cols)],
-                        "vip": [(r, c) for r in range(7, 8) for c in range(showtime.cols)]
-                    }
-                    layout_data = create_seat_layout(showtime.rows, showtime.cols, seat_categories=seat_categories)
-                    seat_layout = SeatLayout(showtime_id=showtime.id, layout=json.dumps(layout_data))
-                    db.session.add(seat_layout)
-
-    db.session.commit()
-    print("Database seeded successfully.")
-    
-    if FoodItem.query.count() == 0:
-        print("Seeding database with initial food items...")
-        food_data = [
-            FoodItem(name="Salted Popcorn (Large)", description="Classic salted popcorn.", price=180.00, category="Snacks", image_url="/static/images/food/popcorn.jpg"),
-            FoodItem(name="Caramel Popcorn (Large)", description="Sweet and crunchy caramel popcorn.", price=220.00, category="Snacks", image_url="/static/images/food/caramel-popcorn.jpg"),
-            FoodItem(name="Nachos with Cheese Dip", description="Crispy nachos served with a warm cheese dip.", price=160.00, category="Snacks", image_url="/static/images/food/nachos.jpg"),
-            FoodItem(name="Coca-Cola (500ml)", description="Chilled soft drink.", price=90.00, category="Drinks", image_url="/static/images/food/coke.jpg"),
-            FoodItem(name="Pepsi (500ml)", description="Chilled soft drink.", price=90.00, category="Drinks", image_url="/static/images/food/pepsi.jpg"),
-            FoodItem(name="Classic Combo", description="1 Salted Popcorn + 1 Coke", price=250.00, category="Combo", image_url="/static/images/food/combo.jpg"), 
-        ]
-        db.session.bulk_save_objects(food_data)
+        movies_data = list(_MOVIE_SEED)
+        movie_ids = db.session.execute(
+            db.insert(Movie).returning(Movie.id), movies_data).scalars().all()
+
+        halls = ["Screen 1", "Screen 2", "Screen 3", "Audi 1"]
+        today = datetime.now().date()
+        # Assign showtime ids client-side so SeatLayout rows can reference them
+        # without a per-row flush; the table is empty when we get this far.
+        next_showtime_id = 1
+        showtimes = []
+        seat_rows = []
+        # One batched draw for every hall assignment (sized for the worst case of
+        # 3 movies per theater) beats ~180 random.choice calls.
+        hall_picks = random.choices(halls, k=3 * len(theater_ids) * 3 * len(SHOWTIME_TIMES))
+        # All 2- and 3-movie line-ups, enumerated once; picking one is a single
+        # choice call instead of a randint + sample pair per theater per day.
+        movie_presets = (tuple(combinations(movie_ids, 2)) + tuple(combinations(movie_ids, 3)))
+
+        for i in range(3):
+            current_date = today + timedelta(days=i)
+            # The four datetimes are the same for every theater/movie that day.
+            day_showtimes = tuple(datetime.combine(current_date, t) for t in SHOWTIME_TIMES)
+            for theater_id in theater_ids:
+                movies_for_theater = random.choice(movie_presets)
+                for movie_id in movies_for_theater:
+                    for showtime_dt in day_showtimes:
+                        showtime = Showtime(id=next_showtime_id, movie_id=movie_id, theater_id=theater_id, time=showtime_dt, hall=hall_picks[next_showtime_id - 1], rows=8, cols=12, price_standard=180.0, price_premium=250.0, price_vip=400.0)
+                        showtimes.append(showtime)
+                        seat_rows.append({"showtime_id": next_showtime_id, "layout": _DEFAULT_LAYOUT})
+                        next_showtime_id += 1
+
+        # Batched INSERTs instead of ~300 unit-of-work passes; the layouts only
+        # differ by showtime_id, so plain dicts through Core executemany skip
+        # ORM object construction entirely.
+        db.session.bulk_save_objects(showtimes)
+        db.session.execute(SeatLayout.__table__.insert(), seat_rows)
+
+        if not db.session.query(FoodItem.query.exists()).scalar():
+            app.logger.info("Seeding database with initial food items...")
+            food_data = list(_FOOD_SEED)
+            db.session.execute(db.insert(FoodItem), food_data)
         
-    db.session.commit()
-    print("Database seeded successfully.")    
+        db.session.commit()
+        app.logger.info("Database seeded successfully.")
+
+def _sqlite_db_exists():
+    # For the default SQLite setup the presence of the file tells us the
+    # schema and seed data are already there, so startup can skip the
+    # create_all reflection queries and the seeding pass entirely. Ask the
+    # engine for the resolved path — Flask-SQLAlchemy anchors relative
+    # sqlite URIs to the instance folder, not the CWD. Other backends can't
+    # be checked this cheaply, so they always initialize.
+    url = db.engine.url
+    if not url.drivername.startswith("sqlite"):
+        return False
+    return bool(url.database) and url.database != ":memory:" and os.path.exists(url.database)
 
 if __name__ == "__main__":
-    with app.app_context():        
-        db.create_all()
-        init_db()
+    with app.app_context():
+        if _sqlite_db_exists():
+            # Warm start: tables exist, but databases created before the
+            # FTS index or version column still need the cheap bootstraps.
+            ensure_movie_fts()
+            ensure_seat_layout_version()
+        else:
+            db.create_all()
+            if db.engine.url.drivername.startswith("sqlite"):
+                # WAL and relaxed sync cut the fsync cost of the bulk seed;
+                # journal_mode is persistent, so later startups benefit too.
+                db.session.execute(db.text("PRAGMA journal_mode=WAL"))
+                db.session.execute(db.text("PRAGMA synchronous=NORMAL"))
+                db.session.execute(db.text("PRAGMA temp_store=MEMORY"))
+            init_db()
  
\ No newline at end of file